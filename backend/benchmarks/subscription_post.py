@@ -0,0 +1,106 @@
+"""Benchmark requests/sec of PushSubscriptionView.post against an in-memory SQLite database.
+
+Run from the backend directory:
+
+    python benchmarks/subscription_post.py [--requests 2000]
+"""
+
+# Django, DRF and app imports must run after settings.configure() and django.setup()
+# pylint: disable=import-outside-toplevel
+
+import argparse
+import os
+import sys
+import time
+
+import django
+from django.conf import settings
+
+
+def configure():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    settings.configure(
+        SECRET_KEY="benchmark",
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "rest_framework",
+            "simple_notifications",
+        ],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        USE_TZ=True,
+        NOTIFICATIONS_VAPID_PUBLIC_KEY="public",
+        NOTIFICATIONS_VAPID_PRIVATE_KEY="private",
+        NOTIFICATIONS_VAPID_EMAIL="benchmark@example.com",
+    )
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def run(name, view, factory, user, payloads):
+    from django.db import connection
+    from rest_framework.test import force_authenticate
+
+    requests = []
+    for payload in payloads:
+        request = factory.post("/subscription/", payload, format="json")
+        force_authenticate(request, user=user)
+        requests.append(request)
+
+    queries = 0
+
+    def count_queries(execute, *args):
+        nonlocal queries
+        queries += 1
+        return execute(*args)
+
+    with connection.execute_wrapper(count_queries):
+        start = time.perf_counter()
+        for request in requests:
+            response = view(request)
+            assert response.status_code == 201, response.data
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<20} {len(requests) / elapsed:>10.0f} req/s "
+        f"{queries / len(requests):>6.2f} queries/req"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    configure()
+
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIRequestFactory
+
+    # importable once configure() added the backend directory to sys.path
+    from simple_notifications.views import PushSubscriptionView  # pylint: disable=import-error
+
+    view = PushSubscriptionView.as_view()
+    factory = APIRequestFactory()
+    user = get_user_model().objects.create(username="benchmark")
+
+    def payloads(auth):
+        return [
+            {
+                "endpoint": f"https://push.example.com/{i}",
+                "keys": {"p256dh": "p256dh", "auth": auth},
+                "metadata": {"browser": "Firefox", "os": "Linux"},
+            }
+            for i in range(args.requests)
+        ]
+
+    run("new subscription", view, factory, user, payloads("auth"))
+    run("identical re-post", view, factory, user, payloads("auth"))
+    run("changed keys", view, factory, user, payloads("rotated"))
+
+
+if __name__ == "__main__":
+    main()
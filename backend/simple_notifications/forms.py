@@ -11,6 +11,7 @@ class NotificationPreferencesForm(forms.ModelForm):
             "quiet_hours_timezone",
             "quiet_hours_start",
             "quiet_hours_end",
+            "digest_window",
         ]
         widgets = {
             "quiet_hours_start": forms.TimeInput(attrs={"type": "time"}),
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from simple_notifications.services import NotificationDigestService
+
+
+class Command(BaseCommand):
+    help = "Send buffered notification digests whose digest window has elapsed"
+
+    def handle(self, *args, **options):
+        sent = NotificationDigestService.flush_due_digests()
+        self.stdout.write(f"Sent {sent} notification digest(s)")
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "simple_notifications",
+            "0006_pushsubscription_metadata_pushsubscription_name_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationpreferences",
+            name="digest_window",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="PendingNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.TextField()),
+                ("body", models.TextField(blank=True, default="")),
+                ("data", models.JSONField(default=dict)),
+                (
+                    "icon",
+                    models.CharField(
+                        blank=True, default=None, max_length=500, null=True
+                    ),
+                ),
+                (
+                    "badge",
+                    models.CharField(
+                        blank=True, default=None, max_length=500, null=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("flush_at", models.DateTimeField(db_index=True)),
+                (
+                    "claim",
+                    models.UUIDField(
+                        blank=True, db_index=True, default=None, null=True
+                    ),
+                ),
+                (
+                    "claimed_at",
+                    models.DateTimeField(blank=True, default=None, null=True),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "subscription",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_notifications",
+                        to="simple_notifications.pushsubscription",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("simple_notifications", "0007_pendingnotification_digest_window"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pushsubscription",
+            index=models.Index(
+                fields=["content_type", "object_id", "created_at", "id"],
+                name="simple_noti_content_7079e5_idx",
+            ),
+        ),
+    ]
@@ -20,6 +20,8 @@ class NotificationPreferences(models.Model):
     quiet_hours_start = models.TimeField(null=True, blank=True)
     quiet_hours_end = models.TimeField(null=True, blank=True)
     quiet_hours_timezone = models.CharField(max_length=50, default="UTC")
+    # seconds, None disables digests (or inherits the user's window for subscriptions)
+    digest_window = models.PositiveIntegerField(null=True, blank=True)
 
     class Meta:
         unique_together = [("content_type", "object_id")]
@@ -33,8 +35,21 @@ class NotificationPreferences(models.Model):
             "quiet_hours_start": self.quiet_hours_start,
             "quiet_hours_end": self.quiet_hours_end,
             "quiet_hours_timezone": self.quiet_hours_timezone,
+            "digest_window": self.digest_window,
         }
 
+    @staticmethod
+    def merge(user_preferences, subscription_preferences) -> dict:
+        """Merge user and subscription preferences, the subscription's taking precedence"""
+        result = {
+            **user_preferences.to_dict(),
+            **subscription_preferences.to_dict(),
+        }
+        # subscriptions inherit the digest window of the user unless they set their own
+        if subscription_preferences.digest_window is None:
+            result["digest_window"] = user_preferences.digest_window
+        return result
+
 
 class PushSubscription(models.Model):
     """Model to store push notification subscriptions for clients"""
@@ -57,6 +72,12 @@ class PushSubscription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination of a user's subscriptions
+            models.Index(fields=["content_type", "object_id", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"Push subscription for {self.user} ({self.name or self.endpoint[:40]})"
 
@@ -82,14 +103,39 @@ class PushSubscription(models.Model):
         user_preferences = NotificationPreferencesService.get_or_create_user_preferences(self.user)
         subscription_preferences = NotificationPreferencesService.get_or_create_user_preferences(self.user, self.pk)
 
-        result = {
-            **user_preferences.to_dict(),
-            **subscription_preferences.to_dict(),
-        }
+        result = NotificationPreferences.merge(user_preferences, subscription_preferences)
         cache.set(key, result, timeout=None)
         return result
 
 
+class PendingNotification(models.Model):
+    """Notification buffered for a subscription until its digest window is flushed"""
+
+    subscription = models.ForeignKey(
+        PushSubscription,
+        on_delete=models.CASCADE,
+        related_name="pending_notifications",
+    )
+
+    title = models.TextField()
+    body = models.TextField(blank=True, default="")
+    data = models.JSONField(default=dict)
+    icon = models.CharField(max_length=500, blank=True, null=True, default=None)
+    badge = models.CharField(max_length=500, blank=True, null=True, default=None)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    flush_at = models.DateTimeField(db_index=True)
+
+    # set while a flush job is delivering the notification, so overlapping jobs skip it
+    claim = models.UUIDField(null=True, blank=True, default=None, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, default=None)
+    # failed delivery attempts, the notification is dropped after too many
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return f"Pending notification for {self.subscription_id} ({self.title[:40]})"
+
+
 @receiver([post_save, post_delete], sender=NotificationPreferences)
 def bust_subscription_preferences_cache(sender, instance: NotificationPreferences, **kwargs):
     """Clear cached preferences when a NotificationPreferences record changes."""
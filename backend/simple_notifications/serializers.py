@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from simple_notifications.models import PushSubscription
+from simple_notifications.services import NotificationSubscriptionService
 
 
 class PushSubscriptionCreateSerializer(serializers.Serializer):
@@ -23,12 +24,38 @@ class PushSubscriptionCreateSerializer(serializers.Serializer):
         return value
 
 
+class PushSubscriptionSyncSerializer(serializers.Serializer):
+    """Serializer for syncing a client's push subscriptions in one request"""
+
+    subscriptions = PushSubscriptionCreateSerializer(many=True, allow_empty=False, max_length=100)
+    removed_endpoints = serializers.ListField(
+        child=serializers.URLField(),
+        required=False,
+        default=list,
+        max_length=100,
+    )
+
+
 class PushSubscriptionUnsubscribeSerializer(serializers.Serializer):
     """Serializer for unsubscribe requests"""
 
     endpoint = serializers.URLField()
 
 
+class PushSubscriptionListSerializer(serializers.Serializer):
+    """Serializer for subscription list query parameters"""
+
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=100, default=50)
+
+    def validate_cursor(self, value):
+        try:
+            position = NotificationSubscriptionService.decode_cursor(value)
+        except ValueError as ex:
+            raise serializers.ValidationError("Invalid cursor.") from ex
+        return NotificationSubscriptionService.encode_cursor(*position)
+
+
 class PushSubscriptionSerializer(serializers.ModelSerializer):
     """Serializer for listing/detailing subscriptions"""
 
@@ -1,7 +1,12 @@
+import base64
 import json
 import logging
 import random
-from typing import Dict, Any, Optional
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, Any, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from pywebpush import webpush, WebPushException
@@ -9,13 +14,48 @@ from pywebpush import webpush, WebPushException
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
-from django.db.models import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Max, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
 
-from simple_notifications.models import PushSubscription, NotificationPreferences
+from simple_notifications.models import (
+    PushSubscription,
+    NotificationPreferences,
+    PendingNotification,
+)
 
 
 logger = logging.getLogger(__name__)
 
+# seconds to wait for the push service before a delivery fails
+WEBPUSH_TIMEOUT = 10
+
+# maximum number of buffered notifications listed in a digest
+DIGEST_MAX_ITEMS = 10
+# maximum size of the JSON digest payload, push services reject encrypted payloads over
+# 4096 bytes and encryption adds about 100 bytes
+DIGEST_MAX_PAYLOAD_BYTES = 3800
+# failed deliveries after which buffered notifications are dropped
+DIGEST_MAX_ATTEMPTS = 5
+# number of subscriptions whose digests are claimed and sent at once
+DIGEST_FLUSH_BATCH_SIZE = 500
+# seconds a digest is postponed after a failed delivery or during quiet hours
+DIGEST_RETRY_DELAY = 300
+# seconds after which a claim of a crashed flush job expires, running jobs refresh their claim
+# every half of it
+DIGEST_CLAIM_TIMEOUT = 600
+
+# fields overwritten when a subscription is re-posted for an existing endpoint
+SUBSCRIPTION_UPSERT_FIELDS = [
+    "content_type_id",
+    "object_id",
+    "p256dh",
+    "auth",
+    "app_name",
+    "metadata",
+]
+
 
 class NotificationService:
     # pylint: disable=too-many-arguments,too-many-positional-arguments
@@ -29,7 +69,54 @@ class NotificationService:
         icon: str = None,
         badge: str = None,
     ) -> bool:
-        """Send a push notification to a specific subscription using pywebpush"""
+        """Send a push notification to a specific subscription using pywebpush.
+
+        When the subscription preferences define a digest window, the notification is buffered
+        and delivered later as part of a digest by `NotificationDigestService.flush_due_digests`.
+        """
+        try:
+            preferences = subscription.get_subscription_preferences()
+
+            if not NotificationService._passes_frequency(preferences):
+                logger.debug("Skipping notification due to subscription preferences")
+                return False
+
+            if preferences.get("digest_window"):
+                NotificationDigestService.buffer_notification(
+                    subscription,
+                    title,
+                    body,
+                    data=data,
+                    icon=icon,
+                    badge=badge,
+                    digest_window=preferences["digest_window"],
+                )
+                logger.debug("Buffered notification for digest")
+                return False
+
+            if NotificationService._is_quiet_hours(preferences):
+                logger.debug("Skipping notification due to subscription preferences")
+                return False
+
+            return NotificationService._deliver(
+                subscription,
+                {
+                    "title": title,
+                    "body": body,
+                    "data": data or {},
+                    "silent": silent,
+                    "icon": icon,
+                    "badge": badge,
+                },
+            )
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error sending push notification: %s", e)
+            return False
+
+    @staticmethod
+    def _deliver(subscription: PushSubscription, notification_payload: Dict[str, Any]) -> bool:
+        """Deliver a payload to the subscription, bypassing preferences"""
         try:
             if (
                 not settings.NOTIFICATIONS_VAPID_PRIVATE_KEY
@@ -38,19 +125,6 @@ class NotificationService:
             ):
                 raise ValueError("VAPID keys or email are not set")
 
-            if not NotificationService._should_send_notification(subscription):
-                logger.debug("Skipping notification due to subscription preferences")
-                return False
-
-            notification_payload = {
-                "title": title,
-                "body": body,
-                "data": data or {},
-                "silent": silent,
-                "icon": icon,
-                "badge": badge,
-            }
-
             payload = json.dumps(notification_payload)
 
             subscription_info = {
@@ -68,12 +142,17 @@ class NotificationService:
                 vapid_claims={
                     "sub": f"mailto:{settings.NOTIFICATIONS_VAPID_EMAIL}",
                 },
+                timeout=WEBPUSH_TIMEOUT,
             )
             return True
 
         except WebPushException as ex:
-            if ex.response is not None and ex.response.status_code == 410:
-                logger.info("Subscription expired (410 Gone), deleting: %s", subscription.pk)
+            if ex.response is not None and ex.response.status_code in (404, 410):
+                logger.info(
+                    "Subscription expired (%s), deleting: %s",
+                    ex.response.status_code,
+                    subscription.pk,
+                )
                 subscription.delete()
                 return False
             logger.error("WebPushException: %s", ex)
@@ -81,31 +160,29 @@ class NotificationService:
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error sending push notification: %s", e)
             return False
-    
-    @staticmethod
-    def _should_send_notification(subscription: PushSubscription) -> bool:
-        """Returns True/False based on the subscription preferences"""
-        preferences = subscription.get_subscription_preferences()
 
-        # frequency
+    @staticmethod
+    def _passes_frequency(preferences: Dict[str, Any]) -> bool:
+        """Returns False if the notification is dropped by the preferred notification frequency"""
         preference_frequency = preferences.get("notification_frequency", 100)
-        if preference_frequency != 100 and random.randint(0, 100) > preference_frequency:
-            return False
+        return preference_frequency == 100 or random.randint(0, 100) <= preference_frequency
 
-        # quiet hours
+    @staticmethod
+    def _is_quiet_hours(preferences: Dict[str, Any]) -> bool:
+        """Returns True if the current time falls into the preferred quiet hours"""
         quiet_start = preferences.get("quiet_hours_start")
         quiet_end = preferences.get("quiet_hours_end")
-        if quiet_start is not None and quiet_end is not None:
-            tz_name = preferences.get("quiet_hours_timezone", "UTC")
-            tz = ZoneInfo(tz_name)
-            now_local = timezone.now().astimezone(tz).time()
+        if quiet_start is None or quiet_end is None:
+            return False
 
-            # account for overnight ranges
-            if quiet_start <= quiet_end:
-                return quiet_start <= now_local <= quiet_end
-            return now_local >= quiet_start or now_local <= quiet_end
+        tz_name = preferences.get("quiet_hours_timezone", "UTC")
+        tz = ZoneInfo(tz_name)
+        now_local = timezone.now().astimezone(tz).time()
 
-        return True
+        # account for overnight ranges
+        if quiet_start <= quiet_end:
+            return quiet_start <= now_local <= quiet_end
+        return now_local >= quiet_start or now_local <= quiet_end
 
     @staticmethod
     def create_subscription(
@@ -116,34 +193,200 @@ class NotificationService:
         metadata: Dict[str, Any] = None,
         app_name: str = None,
     ) -> PushSubscription:
-        """Create or update a subscription keyed on endpoint. Generate a name from metadata"""
-        content_type = ContentType.objects.get_for_model(user)
-        metadata = metadata or {}
-
-        subscription, created = PushSubscription.objects.update_or_create(
-            endpoint=endpoint,
-            defaults={
-                "content_type": content_type,
-                "object_id": user.pk,
-                "p256dh": p256dh,
-                "auth": auth,
-                "app_name": app_name,
-                "metadata": metadata,
-            },
-        )
+        """Create or update a subscription keyed on endpoint. Generate a name from metadata.
 
-        if created and not subscription.name:
-            browser = metadata.get("browser", "")
-            os_name = metadata.get("os", "")
-            if browser or os_name:
-                parts = [p for p in [browser, os_name] if p]
-                subscription.name = " on ".join(parts)
-            else:
-                subscription.name = "Unknown device"
-            subscription.save(update_fields=["name"])
+        Nothing is written when the stored subscription already matches. An endpoint posted by
+        another user moves to that user, as a browser's endpoint follows whoever is logged in on it.
+        """
+        values = NotificationService._subscription_values(user, p256dh, auth, metadata, app_name)
+
+        subscription = PushSubscription.objects.filter(endpoint=endpoint).first()
+        if subscription is None:
+            subscription = PushSubscription(
+                endpoint=endpoint,
+                name=NotificationService._generate_subscription_name(values["metadata"]),
+                **values,
+            )
+            return NotificationService._insert_subscriptions([subscription])[0]
 
+        changed = [
+            field for field, value in values.items() if getattr(subscription, field) != value
+        ]
+        if changed:
+            for field in changed:
+                setattr(subscription, field, values[field])
+            subscription.save(update_fields=[*changed, "updated_at"])
         return subscription
 
+    @staticmethod
+    def sync_subscriptions(
+        user,
+        subscriptions: List[Dict[str, Any]],
+        removed_endpoints: List[str] = None,
+    ) -> Tuple[QuerySet, List[str]]:
+        """Create or update the given subscriptions and delete the removed ones in bulk queries.
+
+        Each item holds the `create_subscription` arguments. Unlike `create_subscription`, endpoints
+        owned by another user are skipped, and only the user's subscriptions listed in
+        `removed_endpoints` are deleted. Returns the user's synced subscriptions and the skipped
+        endpoints, which the client can re-post one by one to take them over.
+        """
+        values_by_endpoint = {
+            item["endpoint"]: NotificationService._subscription_values(
+                user,
+                item["p256dh"],
+                item["auth"],
+                item.get("metadata"),
+                item.get("app_name"),
+            )
+            for item in subscriptions
+        }
+        existing = {
+            subscription.endpoint: subscription
+            for subscription in PushSubscription.objects.filter(endpoint__in=values_by_endpoint)
+        }
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        skipped = []
+        for endpoint, values in values_by_endpoint.items():
+            subscription = existing.get(endpoint)
+            if subscription is None:
+                to_create.append(
+                    PushSubscription(
+                        endpoint=endpoint,
+                        name=NotificationService._generate_subscription_name(values["metadata"]),
+                        **values,
+                    )
+                )
+            elif (subscription.content_type_id, subscription.object_id) != (
+                values["content_type_id"],
+                values["object_id"],
+            ):
+                skipped.append(endpoint)
+            elif any(getattr(subscription, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(subscription, field, value)
+                subscription.updated_at = now
+                to_update.append(subscription)
+
+        user_subscriptions = NotificationSubscriptionService.get_user_subscriptions(user)
+        with transaction.atomic():
+            if to_update:
+                PushSubscription.objects.bulk_update(
+                    to_update, fields=[*SUBSCRIPTION_UPSERT_FIELDS, "updated_at"]
+                )
+            NotificationService._create_missing_subscriptions(to_create)
+            if removed_endpoints:
+                user_subscriptions.filter(endpoint__in=removed_endpoints).exclude(
+                    endpoint__in=values_by_endpoint
+                ).delete()
+
+        return user_subscriptions.filter(endpoint__in=values_by_endpoint), skipped
+
+    @staticmethod
+    def _create_missing_subscriptions(subscriptions: List[PushSubscription]):
+        """Insert new subscriptions, endpoints inserted concurrently keep their owner"""
+        features = connections[router.db_for_write(PushSubscription)].features
+        if features.supports_ignore_conflicts:
+            PushSubscription.objects.bulk_create(subscriptions, ignore_conflicts=True)
+            return
+        for subscription in subscriptions:
+            PushSubscription.objects.get_or_create(
+                endpoint=subscription.endpoint,
+                defaults={
+                    field: getattr(subscription, field)
+                    for field in [*SUBSCRIPTION_UPSERT_FIELDS, "name"]
+                },
+            )
+
+    @staticmethod
+    def _subscription_values(
+        user,
+        p256dh: str,
+        auth: str,
+        metadata: Dict[str, Any],
+        app_name: str,
+    ) -> Dict[str, Any]:
+        return {
+            "content_type_id": ContentType.objects.get_for_model(user).pk,
+            "object_id": user.pk,
+            "p256dh": p256dh,
+            "auth": auth,
+            "app_name": app_name,
+            "metadata": metadata or {},
+        }
+
+    @staticmethod
+    def _generate_subscription_name(metadata: Dict[str, Any]) -> str:
+        browser = metadata.get("browser", "")
+        os_name = metadata.get("os", "")
+        if browser or os_name:
+            parts = [p for p in [browser, os_name] if p]
+            return " on ".join(parts)
+        return "Unknown device"
+
+    @staticmethod
+    def _insert_subscriptions(subscriptions: List[PushSubscription]) -> List[PushSubscription]:
+        """Insert new subscriptions, updating rows whose endpoint was inserted concurrently.
+
+        Uses a single INSERT ... ON CONFLICT where the database supports it. The generated name
+        of an already existing row is kept.
+        """
+        features = connections[router.db_for_write(PushSubscription)].features
+        if not features.supports_update_conflicts:
+            return [
+                NotificationService._get_or_create_subscription(subscription)
+                for subscription in subscriptions
+            ]
+
+        kwargs = {
+            "update_conflicts": True,
+            "update_fields": [*SUBSCRIPTION_UPSERT_FIELDS, "updated_at"],
+        }
+        if features.supports_update_conflicts_with_target:
+            kwargs["unique_fields"] = ["endpoint"]
+        PushSubscription.objects.bulk_create(subscriptions, **kwargs)
+        NotificationService._read_back_subscriptions(subscriptions)
+        return subscriptions
+
+    @staticmethod
+    def _get_or_create_subscription(subscription: PushSubscription) -> PushSubscription:
+        """Insert or update a subscription on backends without INSERT ... ON CONFLICT"""
+        values = {field: getattr(subscription, field) for field in SUBSCRIPTION_UPSERT_FIELDS}
+        saved_subscription, created = PushSubscription.objects.get_or_create(
+            endpoint=subscription.endpoint,
+            defaults={**values, "name": subscription.name},
+        )
+        if not created:
+            for field, value in values.items():
+                setattr(saved_subscription, field, value)
+            saved_subscription.save(update_fields=[*SUBSCRIPTION_UPSERT_FIELDS, "updated_at"])
+        return saved_subscription
+
+    @staticmethod
+    def _read_back_subscriptions(subscriptions: List[PushSubscription]):
+        """Set the stored primary key, name and creation time of upserted subscriptions.
+
+        Primary keys are not returned for upserts on all Django versions and backends.
+        """
+        missing = {
+            subscription.endpoint: subscription
+            for subscription in subscriptions
+            if subscription.pk is None
+        }
+        if not missing:
+            return
+        rows = PushSubscription.objects.filter(endpoint__in=missing).values_list(
+            "endpoint", "pk", "name", "created_at"
+        )
+        for endpoint, pk, name, created_at in rows:
+            missing[endpoint].pk = pk
+            missing[endpoint].name = name
+            missing[endpoint].created_at = created_at
+            missing[endpoint]._state.adding = False  # pylint: disable=protected-access
+
 
 class NotificationSubscriptionService:
     @staticmethod
@@ -155,6 +398,67 @@ class NotificationSubscriptionService:
             object_id=user.pk,
         )
 
+    @staticmethod
+    def paginate_subscriptions(
+        queryset: QuerySet,
+        cursor: str = None,
+        limit: int = 50,
+    ) -> Tuple[List[PushSubscription], Optional[str]]:
+        """Return a page of subscriptions ordered by (created_at, id) and the next page cursor.
+
+        Raises ValueError if the cursor is invalid.
+        """
+        queryset = queryset.order_by("created_at", "id")
+        if cursor:
+            created_at, pk = NotificationSubscriptionService.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+
+        subscriptions = list(queryset[: limit + 1])
+        if len(subscriptions) <= limit:
+            return subscriptions, None
+
+        subscriptions = subscriptions[:limit]
+        last = subscriptions[-1]
+        return subscriptions, NotificationSubscriptionService.encode_cursor(
+            last.created_at, last.pk
+        )
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, pk: int) -> str:
+        value = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Return the (created_at, id) position of a cursor. Raises ValueError if it is invalid"""
+        try:
+            created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (ValueError, UnicodeError) as ex:
+            raise ValueError("Invalid cursor") from ex
+        if created_at is None or timezone.is_naive(created_at) or not 1 <= pk < 2**63:
+            raise ValueError("Invalid cursor")
+        return created_at, pk
+
+    @staticmethod
+    def get_subscriptions_etag(queryset: QuerySet, *variant) -> str:
+        """Return a weak ETag derived from the latest update and the number of subscriptions.
+
+        `variant` values (e.g. pagination parameters) are mixed in so each page gets its own tag.
+        """
+        stats = queryset.order_by().aggregate(last_updated=Max("updated_at"), count=Count("id"))
+        return NotificationSubscriptionService.build_etag(
+            stats["last_updated"], stats["count"], *variant
+        )
+
+    @staticmethod
+    def build_etag(last_updated: Optional[datetime], count: int, *variant) -> str:
+        timestamp = last_updated.timestamp() if last_updated else 0
+        return f'W/"{"-".join(str(part) for part in (timestamp, count, *variant))}"'
+
     @staticmethod
     def get_user_subscription(user, subscription_id: int = None, endpoint: str = None) -> Optional[PushSubscription]:
         """Get a user subscription by ID or endpoint"""
@@ -209,3 +513,198 @@ class NotificationPreferencesService:
             setattr(preferences, field, value)
         preferences.save()
         return preferences
+
+
+class NotificationDigestService:
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    @staticmethod
+    def buffer_notification(
+        subscription: PushSubscription,
+        title: str,
+        body: str,
+        data: Dict[str, Any] = None,
+        icon: str = None,
+        badge: str = None,
+        digest_window: int = 0,
+    ) -> PendingNotification:
+        """Buffer a notification until the digest window (in seconds) of the subscription elapses"""
+        return PendingNotification.objects.create(
+            subscription=subscription,
+            title=title,
+            body=body or "",
+            data=data or {},
+            icon=icon,
+            badge=badge,
+            flush_at=timezone.now() + timedelta(seconds=digest_window),
+        )
+
+    @staticmethod
+    def build_digest(pending: List[PendingNotification], count: int = None) -> Dict[str, Any]:
+        """Summarize buffered notifications (oldest first) into a single notification payload.
+
+        `count` is the total number of buffered notifications when only the latest are passed.
+        The payload is shrunk to `DIGEST_MAX_PAYLOAD_BYTES` by dropping item data, then the oldest
+        items and finally by truncating the text.
+        """
+        count = count or len(pending)
+        latest = pending[-1]
+        payload = {
+            "title": latest.title,
+            "body": latest.body,
+            "data": latest.data,
+            "silent": False,
+            "icon": latest.icon,
+            "badge": latest.badge,
+        }
+        fits = NotificationDigestService._fits_payload
+
+        if count == 1:
+            if not fits(payload):
+                payload["data"] = {}
+        else:
+            items = [
+                {"title": item.title, "body": item.body, "data": item.data}
+                for item in pending[-DIGEST_MAX_ITEMS:]
+            ]
+            payload["title"] = f"{count} new notifications"
+            payload["data"] = {"digest": True, "count": count, "notifications": items}
+            payload["body"] = "\n".join(item["title"] for item in reversed(items))
+            if not fits(payload):
+                for item in items:
+                    del item["data"]
+            while not fits(payload) and items:
+                items.pop(0)
+                payload["body"] = "\n".join(item["title"] for item in reversed(items))
+
+        for key in ("body", "title"):
+            while not fits(payload) and payload[key]:
+                excess = len(json.dumps(payload).encode()) - DIGEST_MAX_PAYLOAD_BYTES
+                payload[key] = payload[key][: max(len(payload[key]) - excess, 0)]
+        return payload
+
+    @staticmethod
+    def _fits_payload(payload: Dict[str, Any]) -> bool:
+        return len(json.dumps(payload).encode()) <= DIGEST_MAX_PAYLOAD_BYTES
+
+    @staticmethod
+    def flush_due_digests(now: datetime = None, batch_size: int = DIGEST_FLUSH_BATCH_SIZE) -> int:
+        """Send one digest per subscription whose digest window has elapsed.
+
+        Pending notifications are claimed in batches of subscriptions before sending, so overlapping
+        flush jobs do not send the same digest twice. Digests that fail or fall into quiet hours are
+        postponed, notifications failing `DIGEST_MAX_ATTEMPTS` times are dropped. Returns the number
+        of digests sent.
+        """
+        now = now or timezone.now()
+        claim_expiry = now - timedelta(seconds=DIGEST_CLAIM_TIMEOUT)
+        unclaimed = Q(claim__isnull=True) | Q(claimed_at__lt=claim_expiry)
+
+        sent = 0
+        while True:
+            due_subscription_ids = list(
+                PendingNotification.objects.filter(unclaimed, flush_at__lte=now)
+                .order_by()
+                .values_list("subscription_id", flat=True)
+                .distinct()[:batch_size]
+            )
+            if not due_subscription_ids:
+                return sent
+
+            claim = uuid.uuid4()
+            PendingNotification.objects.filter(
+                unclaimed,
+                subscription_id__in=due_subscription_ids,
+                created_at__lte=now,
+            ).update(claim=claim, claimed_at=timezone.now())
+            sent += NotificationDigestService._send_claimed_digests(claim, now)
+
+    @staticmethod
+    def _send_claimed_digests(claim: uuid.UUID, now: datetime) -> int:
+        claimed = PendingNotification.objects.filter(claim=claim)
+        counts = dict(
+            claimed.order_by()
+            .values("subscription_id")
+            .annotate(count=Count("id"))
+            .values_list("subscription_id", "count")
+        )
+        latest = list(
+            claimed.annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=[F("subscription_id")],
+                    order_by=[F("created_at").desc(), F("pk").desc()],
+                )
+            )
+            .filter(position__lte=DIGEST_MAX_ITEMS)
+            .select_related("subscription")
+            .order_by("subscription_id", "created_at", "pk")
+        )
+        preferences = NotificationDigestService._load_preferences(
+            {item.subscription_id: item.subscription for item in latest}.values()
+        )
+
+        delivered = []
+        failed = []
+        refreshed_at = timezone.now()
+        for subscription_id, group in groupby(latest, key=lambda item: item.subscription_id):
+            # keep the claim alive while the batch is being delivered
+            if timezone.now() - refreshed_at > timedelta(seconds=DIGEST_CLAIM_TIMEOUT / 2):
+                refreshed_at = timezone.now()
+                claimed.update(claimed_at=refreshed_at)
+
+            group = list(group)
+            if NotificationService._is_quiet_hours(  # pylint: disable=protected-access
+                preferences[subscription_id]
+            ):
+                continue
+            if NotificationService._deliver(  # pylint: disable=protected-access
+                group[0].subscription,
+                NotificationDigestService.build_digest(group, counts[subscription_id]),
+            ):
+                delivered.append(subscription_id)
+            else:
+                failed.append(subscription_id)
+
+        # subscriptions deleted on delivery (404/410) already cascaded their pending notifications
+        claimed.filter(subscription_id__in=delivered).delete()
+        dropped, _ = claimed.filter(
+            subscription_id__in=failed,
+            attempts__gte=DIGEST_MAX_ATTEMPTS - 1,
+        ).delete()
+        if dropped:
+            logger.warning("Dropped %s pending notifications after failed deliveries", dropped)
+        claimed.filter(subscription_id__in=failed).update(attempts=F("attempts") + 1)
+        claimed.update(
+            claim=None,
+            claimed_at=None,
+            flush_at=now + timedelta(seconds=DIGEST_RETRY_DELAY),
+        )
+        return len(delivered)
+
+    @staticmethod
+    def _load_preferences(subscriptions) -> Dict[int, Dict[str, Any]]:
+        """Return merged preferences by subscription id, loading the preferences in one query"""
+        subscriptions = list(subscriptions)
+        push_content_type = ContentType.objects.get_for_model(PushSubscription)
+        owners = Q(
+            content_type=push_content_type,
+            object_id__in=[subscription.pk for subscription in subscriptions],
+        )
+        user_ids_by_content_type = defaultdict(set)
+        for subscription in subscriptions:
+            user_ids_by_content_type[subscription.content_type_id].add(subscription.object_id)
+        for content_type_id, user_ids in user_ids_by_content_type.items():
+            owners |= Q(content_type_id=content_type_id, object_id__in=user_ids)
+
+        records = {
+            (record.content_type_id, record.object_id): record
+            for record in NotificationPreferences.objects.filter(owners)
+        }
+        default = NotificationPreferences()
+        return {
+            subscription.pk: NotificationPreferences.merge(
+                records.get((subscription.content_type_id, subscription.object_id), default),
+                records.get((push_content_type.pk, subscription.pk), default),
+            )
+            for subscription in subscriptions
+        }
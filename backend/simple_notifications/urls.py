@@ -10,6 +10,16 @@ urlpatterns = [
         views.PushSubscriptionView.as_view(),
         name="push_subscription"
     ),
+    path(
+        "subscription/sync/",
+        views.PushSubscriptionSyncView.as_view(),
+        name="push_subscription_sync",
+    ),
+    path(
+        "subscription/<int:subscription_id>/",
+        views.PushSubscriptionDetailView.as_view(),
+        name="push_subscription_detail",
+    ),
     path(
         "service-worker-push/",
         views.ServiceWorkerPushView.as_view(),
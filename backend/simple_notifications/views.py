@@ -2,9 +2,11 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
 
 from simple_notifications.services import (
     NotificationService,
@@ -12,16 +14,57 @@ from simple_notifications.services import (
 )
 from simple_notifications.serializers import (
     PushSubscriptionCreateSerializer,
+    PushSubscriptionListSerializer,
     PushSubscriptionSerializer,
+    PushSubscriptionSyncSerializer,
     PushSubscriptionUnsubscribeSerializer,
 )
 
 
+def etag_matches(request, etag: str) -> bool:
+    """Weak comparison of the etag against the If-None-Match header"""
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    return "*" in if_none_match or etag.removeprefix("W/") in (
+        tag.removeprefix("W/") for tag in if_none_match
+    )
+
+
 class PushSubscriptionView(APIView):
     """View for push subscription operations"""
 
     permission_classes = [IsAuthenticated]
 
+    def get(self, request):
+        """List the user's push subscriptions, cursor-paginated by creation time"""
+        serializer = PushSubscriptionListSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        cursor = serializer.validated_data.get("cursor")
+        limit = serializer.validated_data["limit"]
+
+        queryset = NotificationSubscriptionService.get_user_subscriptions(request.user)
+        etag = NotificationSubscriptionService.get_subscriptions_etag(queryset, cursor or "", limit)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        subscriptions, next_cursor = NotificationSubscriptionService.paginate_subscriptions(
+            queryset.only(*PushSubscriptionSerializer.Meta.fields),
+            cursor=cursor,
+            limit=limit,
+        )
+
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+
+        return Response(
+            {
+                "next": next_url,
+                "results": PushSubscriptionSerializer(subscriptions, many=True).data,
+            },
+            headers={"ETag": etag},
+        )
+
     def post(self, request):
         """Create a new push subscription"""
         serializer = PushSubscriptionCreateSerializer(data=request.data)
@@ -61,6 +104,75 @@ class PushSubscriptionView(APIView):
         )
 
 
+class PushSubscriptionSyncView(APIView):
+    """View for syncing push subscriptions of a client in one request"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Create or update the given push subscriptions and delete the removed ones"""
+        serializer = PushSubscriptionSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        subscriptions, skipped = NotificationService.sync_subscriptions(
+            request.user,
+            [
+                {
+                    "endpoint": item["endpoint"],
+                    "p256dh": item["keys"]["p256dh"],
+                    "auth": item["keys"]["auth"],
+                    "app_name": item.get("app_name"),
+                    "metadata": item.get("metadata") or {},
+                }
+                for item in serializer.validated_data["subscriptions"]
+            ],
+            removed_endpoints=serializer.validated_data["removed_endpoints"],
+        )
+
+        return Response(
+            {
+                "subscriptions": PushSubscriptionSerializer(
+                    subscriptions.only(*PushSubscriptionSerializer.Meta.fields).order_by(
+                        "created_at", "id"
+                    ),
+                    many=True,
+                ).data,
+                # endpoints owned by another user, re-post them to subscription/ to take them over
+                "skipped": skipped,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PushSubscriptionDetailView(APIView):
+    """View for a single push subscription"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, subscription_id):
+        """Retrieve a push subscription of the user"""
+        subscription = (
+            NotificationSubscriptionService.get_user_subscriptions(request.user)
+            .only(*PushSubscriptionSerializer.Meta.fields)
+            .filter(pk=subscription_id)
+            .first()
+        )
+        if not subscription:
+            return Response(
+                {"detail": "Subscription not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        etag = NotificationSubscriptionService.build_etag(subscription.updated_at, 1)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return Response(
+            PushSubscriptionSerializer(subscription).data,
+            headers={"ETag": etag},
+        )
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class ServiceWorkerPushView(APIView):
     """Endpoint for the browser push service"""